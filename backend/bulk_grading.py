@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Offline bulk grading of recorded interview transcripts.
+
+Reads a JSONL file of {"question", "answer", "round"} records (optional "id" and
+"should_shift_topic") and scores each one with interview_step. Results are
+appended to an output JSONL file as they finish, so an interrupted run can be
+resumed by pointing it at the same output file.
+
+Records without an "id" are keyed by a hash of their question, answer and round,
+so resuming still works after the input file is edited. On resume the output
+file is compacted: a truncated last line is dropped, only the last line per id
+is kept, and failed records are removed so they can be graded again.
+
+Usage:
+    python bulk_grading.py transcripts.jsonl results.jsonl --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from retrieve_relevancy import interview_step, retrieve_context
+
+
+# 🔹 Stable id for records that don't carry one
+def record_key(record):
+    content = json.dumps([record["question"], record["answer"], record.get("round", 1)])
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+# 🔹 Load input records
+def load_records(input_path):
+    records = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            # Key on content rather than position so edits to the file don't shift ids
+            record.setdefault("id", record_key(record))
+            records.append(record)
+    return records
+
+
+# 🔹 Read and compact the checkpoint from a previous (possibly interrupted) run
+def load_completed_ids(output_path):
+    if not os.path.exists(output_path):
+        return set()
+
+    latest = {}
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if not isinstance(result, dict) or "id" not in result:
+                continue
+            # Later lines win, so a retried record replaces its earlier row
+            latest.pop(result["id"], None)
+            latest[result["id"]] = result
+
+    # Failed records are dropped here and graded again by this run
+    kept = [r for r in latest.values() if "error" not in r]
+
+    # Rewrite the file so new results never land on a truncated line
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for result in kept:
+            f.write(json.dumps(result) + "\n")
+    os.replace(tmp_path, output_path)
+
+    return {r["id"] for r in kept}
+
+
+# 🔹 Shared retrieval cache
+class ContextCache:
+    """
+    Retrieves lecture context once per distinct query, even when several
+    workers ask for the same query at the same time.
+    """
+
+    def __init__(self, retriever=retrieve_context):
+        self._retriever = retriever
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def get(self, query):
+        with self._lock:
+            future = self._futures.get(query)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._futures[query] = future
+
+        if is_owner:
+            try:
+                docs, _ = self._retriever(query)
+                future.set_result("\n\n".join([d for sublist in docs for d in sublist]))
+            except Exception as e:
+                future.set_exception(e)
+
+        return future.result()
+
+
+# 🔹 Grade a single record
+def grade_record(record, context_cache, context_key="answer", chat=None):
+    start = time.perf_counter()
+    result = {
+        "id": record["id"],
+        "question": record["question"],
+        "answer": record["answer"],
+        "round": record.get("round", 1),
+    }
+
+    try:
+        # Mirror interview_step, which retrieves on this placeholder for empty answers
+        answer = record["answer"] if record["answer"].strip() else "No answer provided."
+        # The live flow retrieves on the answer; "question" shares one lookup per question
+        query = record["question"] if context_key == "question" else answer
+        context = context_cache.get(query)
+        data = interview_step(
+            record["question"],
+            record["answer"],
+            result["round"],
+            record.get("should_shift_topic", False),
+            context=context,
+            chat=chat,
+        )
+        result["score"] = data["score"]
+        result["feedback"] = data["feedback"]
+        result["next_question"] = data["next_question"]
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["latency_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+# 🔹 Grade a whole file
+def run_bulk_grading(input_path, output_path, workers=4, context_key="answer", retriever=retrieve_context, chat=None):
+    records = load_records(input_path)
+    completed = load_completed_ids(output_path)
+    pending = [r for r in records if r["id"] not in completed]
+
+    print(f"📄 {len(records)} records, {len(completed)} already graded, {len(pending)} to grade")
+
+    context_cache = ContextCache(retriever)
+    summary = {"graded": 0, "failed": 0, "skipped": len(records) - len(pending)}
+
+    def write_result(out, result):
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+        if "error" in result:
+            summary["failed"] += 1
+            print(f"❌ Record {result['id']} failed: {result['error']}")
+        else:
+            summary["graded"] += 1
+            print(f"✅ Record {result['id']} scored {result['score']} in {result['latency_s']}s")
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = [executor.submit(grade_record, r, context_cache, context_key, chat) for r in pending]
+        written = set()
+        try:
+            for future in as_completed(futures):
+                written.add(future)
+                write_result(out, future.result())
+        except KeyboardInterrupt:
+            # Drop queued records, but keep whatever is already being graded
+            print("🛑 Interrupted, saving records in progress...")
+            executor.shutdown(wait=False, cancel_futures=True)
+            for future in futures:
+                if future not in written and not future.cancelled():
+                    write_result(out, future.result())
+            print(f"💾 Saved {summary['graded']} graded, {summary['failed']} failed; re-run to resume")
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+    print(f"🎯 Done: {summary['graded']} graded, {summary['failed']} failed, {summary['skipped']} skipped")
+    return summary
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk grade recorded interview answers.")
+    parser.add_argument("input", help="JSONL file of {question, answer, round} records")
+    parser.add_argument("output", help="JSONL file to append results to (also used to resume)")
+    parser.add_argument("--workers", type=positive_int, default=4, help="Number of records graded concurrently")
+    parser.add_argument(
+        "--context-key",
+        choices=["answer", "question"],
+        default="answer",
+        help="Retrieve lecture context by answer (matches the live interview) or by question (one lookup per question)",
+    )
+    args = parser.parse_args()
+
+    run_bulk_grading(args.input, args.output, args.workers, args.context_key)
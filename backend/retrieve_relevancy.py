@@ -70,7 +70,7 @@ def detect_dont_know_response(answer):
     return False
 
 # 🔹 Interview evaluation step
-def interview_step(question, candidate_answer, round_number=1, should_shift_topic=False):
+def interview_step(question, candidate_answer, round_number=1, should_shift_topic=False, context=None, chat=None):
     if not candidate_answer.strip():
         candidate_answer = "No answer provided."
     
@@ -80,8 +80,10 @@ def interview_step(question, candidate_answer, round_number=1, should_shift_topi
         should_shift_topic = True
         print(f"DEBUG: Detected 'I don't know' response, forcing topic shift")
     
-    docs, _ = retrieve_context(candidate_answer)
-    context = "\n\n".join([d for sublist in docs for d in sublist])
+    # Callers that already have the lecture context (e.g. bulk grading) can pass it in
+    if context is None:
+        docs, _ = retrieve_context(candidate_answer)
+        context = "\n\n".join([d for sublist in docs for d in sublist])
 
     # Create difficulty progression based on round number
     difficulty_guidance = ""
@@ -197,7 +199,8 @@ def interview_step(question, candidate_answer, round_number=1, should_shift_topi
         }}
     """
 
-    resp = ollama.chat(model="llama3", messages=[
+    chat = chat or ollama.chat
+    resp = chat(model="llama3", messages=[
         {"role": "system", "content": f"You are a systematic interviewer conducting round {round_number}. You follow logical question progression and {'shift to new topics when instructed' if should_shift_topic else 'maintain topic coherence throughout the interview'}."},
         {"role": "user", "content": prompt}
     ])
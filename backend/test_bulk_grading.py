@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Test script for offline bulk grading, using a stub LLM and stub retriever
+"""
+
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+
+from bulk_grading import run_bulk_grading
+
+
+def stub_chat(model, messages):
+    """Stands in for ollama.chat and always returns a valid evaluation"""
+    return {"message": {"content": json.dumps({
+        "score": 4,
+        "feedback": "Good answer.",
+        "next_question": "Question 2: What is regularization?"
+    })}}
+
+
+def failing_chat(model, messages):
+    raise RuntimeError("LLM unavailable")
+
+
+def make_stub_retriever():
+    calls = []
+    lock = threading.Lock()
+
+    def retriever(query, top_k=3):
+        with lock:
+            calls.append(query)
+        return [["Lecture notes for: " + query]], [[0.1]]
+
+    return retriever, calls
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_bulk_grading():
+    records = [
+        {"id": "a", "question": "What is overfitting?", "answer": "Memorising the training data.", "round": 1},
+        {"id": "b", "question": "What is overfitting?", "answer": "High variance on unseen data.", "round": 1},
+        {"id": "c", "question": "What is PCA?", "answer": "I don't know", "round": 2},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        write_records(input_path, records)
+
+        print("🧪 Testing bulk grading with a stub LLM...")
+        retriever, calls = make_stub_retriever()
+        summary = run_bulk_grading(input_path, output_path, workers=3, context_key="question",
+                                   retriever=retriever, chat=stub_chat)
+
+        results = read_results(output_path)
+        assert summary == {"graded": 3, "failed": 0, "skipped": 0}
+        assert sorted(r["id"] for r in results) == ["a", "b", "c"]
+        assert all(r["score"] == 4 and r["latency_s"] >= 0 for r in results)
+        # Duplicate questions share a single retrieval
+        assert sorted(calls) == ["What is PCA?", "What is overfitting?"]
+
+        print("🧪 Testing resume from checkpoint...")
+        calls.clear()
+        records.append({"id": "d", "question": "What is SVM?", "answer": "A max-margin classifier.", "round": 3})
+        write_records(input_path, records)
+        summary = run_bulk_grading(input_path, output_path, workers=3,
+                                   retriever=retriever, chat=stub_chat)
+
+        results = read_results(output_path)
+        assert summary == {"graded": 1, "failed": 0, "skipped": 3}
+        assert sorted(r["id"] for r in results) == ["a", "b", "c", "d"]
+        # Only the new record is retrieved, keyed on its answer by default
+        assert calls == ["A max-margin classifier."]
+
+
+def test_answer_context_key():
+    records = [
+        {"id": "a", "question": "What is PCA?", "answer": "I don't know", "round": 1},
+        {"id": "b", "question": "What is SVM?", "answer": "I don't know", "round": 1},
+        {"id": "c", "question": "What is KNN?", "answer": "", "round": 1},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        write_records(input_path, records)
+
+        print("🧪 Testing retrieval de-duplication by answer...")
+        retriever, calls = make_stub_retriever()
+        run_bulk_grading(input_path, output_path, workers=3, retriever=retriever, chat=stub_chat)
+
+        # Identical answers share a lookup; empty answers use the live placeholder
+        assert sorted(calls) == ["I don't know", "No answer provided."]
+
+
+def test_failed_records_are_retried():
+    records = [
+        {"id": "a", "question": "What is PCA?", "answer": "Dimensionality reduction.", "round": 1},
+        {"id": "b", "question": "What is SVM?", "answer": "A max-margin classifier.", "round": 1},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        write_records(input_path, records)
+        retriever, _ = make_stub_retriever()
+
+        print("🧪 Testing failure followed by a retry...")
+        summary = run_bulk_grading(input_path, output_path, workers=2, retriever=retriever, chat=failing_chat)
+        results = read_results(output_path)
+        assert summary == {"graded": 0, "failed": 2, "skipped": 0}
+        assert all("LLM unavailable" in r["error"] for r in results)
+
+        summary = run_bulk_grading(input_path, output_path, workers=2, retriever=retriever, chat=stub_chat)
+        results = read_results(output_path)
+        assert summary == {"graded": 2, "failed": 0, "skipped": 0}
+        # Error rows are replaced, leaving one row per record
+        assert sorted(r["id"] for r in results) == ["a", "b"]
+        assert all("error" not in r for r in results)
+
+
+def test_truncated_checkpoint():
+    records = [
+        {"id": "a", "question": "What is PCA?", "answer": "Dimensionality reduction.", "round": 1},
+        {"id": "b", "question": "What is SVM?", "answer": "A max-margin classifier.", "round": 1},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        write_records(input_path, records)
+        retriever, _ = make_stub_retriever()
+        run_bulk_grading(input_path, output_path, workers=1, retriever=retriever, chat=stub_chat)
+
+        print("🧪 Testing resume after a truncated write...")
+        with open(output_path, "r", encoding="utf-8") as f:
+            first_line = f.readline()
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(first_line)
+            f.write('{"id": "b", "sco')
+
+        summary = run_bulk_grading(input_path, output_path, workers=1, retriever=retriever, chat=stub_chat)
+        results = read_results(output_path)
+        assert summary["graded"] == 1
+        assert sorted(r["id"] for r in results) == ["a", "b"]
+
+
+def test_ids_survive_input_edits():
+    records = [
+        {"question": "What is PCA?", "answer": "Dimensionality reduction.", "round": 1},
+        {"question": "What is SVM?", "answer": "A max-margin classifier.", "round": 1},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        write_records(input_path, records)
+        retriever, calls = make_stub_retriever()
+        run_bulk_grading(input_path, output_path, workers=2, retriever=retriever, chat=stub_chat)
+
+        print("🧪 Testing resume after records are inserted and removed...")
+        calls.clear()
+        edited = [
+            {"question": "What is KNN?", "answer": "Nearest neighbours.", "round": 1},
+            records[1],
+        ]
+        write_records(input_path, edited)
+
+        summary = run_bulk_grading(input_path, output_path, workers=2, retriever=retriever, chat=stub_chat)
+        results = read_results(output_path)
+        assert summary == {"graded": 1, "failed": 0, "skipped": 1}
+        assert calls == ["Nearest neighbours."]
+        assert len({r["id"] for r in results}) == 3
+
+
+def test_interrupt_keeps_finished_records():
+    records = [
+        {"id": i, "question": f"Question {i}", "answer": f"Answer {i}", "round": 1}
+        for i in range(20)
+    ]
+    started = []
+    lock = threading.Lock()
+
+    def slow_chat(model, messages):
+        with lock:
+            started.append(1)
+            # Send Ctrl-C while the third batch of records is being graded
+            if len(started) == 5:
+                os.kill(os.getpid(), signal.SIGINT)
+        time.sleep(0.2)
+        return stub_chat(model, messages)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        write_records(input_path, records)
+        retriever, _ = make_stub_retriever()
+
+        print("🧪 Testing an interrupted run...")
+        start = time.perf_counter()
+        try:
+            run_bulk_grading(input_path, output_path, workers=2, retriever=retriever, chat=slow_chat)
+            assert False, "expected KeyboardInterrupt"
+        except KeyboardInterrupt:
+            pass
+        elapsed = time.perf_counter() - start
+
+        results = read_results(output_path)
+        # Queued records are cancelled; finished and in-flight ones are saved
+        assert elapsed < 2.0
+        assert 4 <= len(results) < len(records)
+        assert len(results) == len(started)
+
+        summary = run_bulk_grading(input_path, output_path, workers=4, retriever=retriever, chat=stub_chat)
+        results = read_results(output_path)
+        assert summary["skipped"] + summary["graded"] == len(records)
+        assert sorted(r["id"] for r in results) == list(range(20))
+
+
+if __name__ == "__main__":
+    test_bulk_grading()
+    test_answer_context_key()
+    test_failed_records_are_retried()
+    test_truncated_checkpoint()
+    test_ids_survive_input_edits()
+    test_interrupt_keeps_finished_records()
+    print("\n🎯 Overall test result: ✅ ALL TESTS PASSED")